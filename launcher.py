@@ -57,6 +57,9 @@ def main():
     features.add_argument(
         '--incremental', action='store_true',
         help='enable incremental solving')
+    features.add_argument(
+        '--lazy_simplify', action='store_true',
+        help='do not simplify symbolic data on every memory write')
     features.add_argument(
         '-v', '--verbose', default='warning', const='warning', nargs='?',
         choices=['warning', 'info', 'debug'],
@@ -88,6 +91,7 @@ def main():
         Configuration.set_stdin(args.stdin, args.sym_stdin)
         Configuration.set_sym_files(args.sym_files)
         Configuration.set_incremental_solving(args.incremental)
+        Configuration.set_simplify_memory_writes(not args.lazy_simplify)
         Configuration.set_elem_index_to_func(wat_file_path)
 
         command_file_name = f"./log/result/{Configuration.get_file_name()}_{Configuration.get_start_time()}/command.json"
@@ -8,7 +8,6 @@ from seewasm.arch.wasm.analyzer import WasmModuleAnalyzer
 from seewasm.arch.wasm.configuration import Configuration
 from seewasm.arch.wasm.disassembler import WasmDisassembler
 from seewasm.arch.wasm.format import format_bb_name, format_func_name
-from seewasm.arch.wasm.utils import readable_internal_func_name
 from seewasm.core.basicblock import BasicBlock
 from seewasm.core.edge import (EDGE_CALL, EDGE_CONDITIONAL_FALSE,
                                EDGE_CONDITIONAL_TRUE, EDGE_FALLTHROUGH,
@@ -399,12 +398,8 @@ class WasmCFG(CFG):
 
         self.call_graph = defaultdict(set)
         for edge in edges:
-            e_from = readable_internal_func_name(
-                Configuration.get_func_index_to_func_name(),
-                edge.node_from)
-            e_to = readable_internal_func_name(
-                Configuration.get_func_index_to_func_name(),
-                edge.node_to)
+            e_from = Configuration.get_readable_func_name(edge.node_from)
+            e_to = Configuration.get_readable_func_name(edge.node_to)
             self.call_graph[e_from].add(e_to)
 
         self.call_graph = {k: list(v) for k, v in self.call_graph.items()}
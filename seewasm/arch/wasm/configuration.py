@@ -1,4 +1,5 @@
 import re
+import sys
 
 from z3 import BitVec, Extract
 
@@ -14,6 +15,10 @@ class bcolors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+    @ staticmethod
+    def warning(msg):
+        return f'{bcolors.WARNING}{msg}{bcolors.ENDC}'
+
 
 class Configuration:
     """
@@ -39,6 +44,8 @@ class Configuration:
     _entry_func = ''
     # the mapping of func index to func name
     _func_index_to_func_name = {}
+    # the mapping of internal func name (e.g., $func12) to its readable name
+    _readable_func_name = {}
     # if enable the instruction-level coverage calculation
     _coverage = False
     # the stdin buffer, can be a list of char or symbols with length of 8 bits
@@ -48,8 +55,12 @@ class Configuration:
     # how many bytes a sym file can hold
     _sym_file_byte_limit = 0
     # keep z3 cache
-    # each value is a tuple, consisting of query times, sat or not, and solver
+    # each key is the frozenset of constraints' hash, the value is sat or not
     _z3_cache_dict = {}
+    # the keys in z3 cache that are regarded as unsat due to invalid-memory
+    _z3_invalid_memory_keys = set()
+    # the solver reused by standalone queries under incremental solving
+    _standalone_solver = None
     # used by args_sizes_get in wasi.py
     _argc_addr = None
     _arg_buf_size_addr = None
@@ -58,6 +69,8 @@ class Configuration:
     _argc_arg_buf_size = []
     # enable the incremental solving or not
     _incremental_solving = False
+    # simplify the data written into symbolic memory or not
+    _simplify_memory_writes = True
     # indicating the analyzed file is instrumented by a dsl file
     _dsl_flag = False
     # the index to function in element section
@@ -169,12 +182,26 @@ class Configuration:
                 func_name = func_name.decode()
                 if "__imported_wasi_snapshot_preview1_" in func_name:
                     func_name = func_name[34:]
-                Configuration._func_index_to_func_name[index] = func_name
+                # interned, as the names are kept and compared in every state
+                Configuration._func_index_to_func_name[index] = sys.intern(
+                    func_name)
         else:
             for index, item in enumerate(func_prototypes):
                 func_name = item[0]
+                # an import's name is kept in bytes if it is not utf-8
+                if isinstance(func_name, str):
+                    func_name = sys.intern(func_name)
                 Configuration._func_index_to_func_name[index] = func_name
 
+    @ staticmethod
+    def get_readable_func_name(internal_func_name):
+        return Configuration._readable_func_name.get(
+            internal_func_name, internal_func_name)
+
+    @ staticmethod
+    def set_readable_func_name(readable_func_name):
+        Configuration._readable_func_name = readable_func_name
+
     @ staticmethod
     def get_coverage():
         return Configuration._coverage
@@ -248,6 +275,14 @@ class Configuration:
     def get_incremental_solving():
         return Configuration._incremental_solving
 
+    @ staticmethod
+    def set_simplify_memory_writes(simplify_memory_writes_flag):
+        Configuration._simplify_memory_writes = simplify_memory_writes_flag
+
+    @ staticmethod
+    def get_simplify_memory_writes():
+        return Configuration._simplify_memory_writes
+
     @ staticmethod
     def set_dsl_flag(dsl_flag):
         pass
@@ -104,7 +104,7 @@ def get_source_location_by_addr(
                                 entry.state.column)
                     if filename != next_filename:
                         logging.warning(
-                            f"{bcolors.WARNING}Source location range filename mismatch! probably due to aggressive optimization (function inlining){bcolors.ENDC}")
+                            bcolors.warning("Source location range filename mismatch! probably due to aggressive optimization (function inlining)"))
                     return (prev_loc, next_loc)
                 line = prevstate.line
                 column = prevstate.column
@@ -245,7 +245,7 @@ def decode_var_type(ana, state, addr_stack, use_global_sp=False):
     func_DIE = get_func_DIE(ana, func_ind, func_offset)
     if func_DIE is None:
         logging.warning(
-            f"{bcolors.WARNING}unable to get function DIE! index: {func_ind}, instruction offset in function: {func_offset}{bcolors.ENDC}")
+            bcolors.warning(f"unable to get function DIE! index: {func_ind}, instruction offset in function: {func_offset}"))
         return None, None
     func_name = func_DIE.attributes['DW_AT_name'].value.decode()
     if not use_global_sp:
@@ -274,7 +274,7 @@ def decode_var_type(ana, state, addr_stack, use_global_sp=False):
                 if start <= delta and delta < start + size:
                     return type_die, size
     logging.warning(
-        f"{bcolors.WARNING}unable to decode variable type: function: {func_name}, offset: {delta}{bcolors.ENDC}")
+        bcolors.warning(f"unable to decode variable type: function: {func_name}, offset: {delta}"))
     return None, None
 
 
@@ -1,10 +1,9 @@
 # This file will initiate a Wasm Symbolic Execution Engine
 # Also, it implements the Instruction Dispatcher
 import logging
-import re
 import sys
-from collections import defaultdict
-from queue import Queue
+from collections import defaultdict, deque
+from operator import attrgetter
 
 from z3 import BitVec, BitVecVal
 
@@ -12,6 +11,7 @@ from seewasm.arch.wasm.analyzer import WasmModuleAnalyzer
 from seewasm.arch.wasm.cfg import WasmCFG
 from seewasm.arch.wasm.configuration import Configuration
 from seewasm.arch.wasm.exceptions import (ASSERT_FAIL, ProcFailTermination,
+                                          UnsupportGlobalTypeError,
                                           UnsupportInstructionError)
 from seewasm.arch.wasm.instructions import (ArithmeticInstructions,
                                             BitwiseInstructions,
@@ -23,6 +23,7 @@ from seewasm.arch.wasm.instructions import (ArithmeticInstructions,
                                             ParametricInstructions,
                                             VariableInstructions)
 from seewasm.arch.wasm.lib.utils import is_modeled
+from seewasm.arch.wasm.memory import DataSection
 from seewasm.arch.wasm.utils import (getConcreteBitVec, init_file_for_file_sys,
                                      readable_internal_func_name)
 from seewasm.arch.wasm.vmstate import WasmVMstate
@@ -46,6 +47,31 @@ else:
     logging_config['level'] = logging.WARNING
 logging.basicConfig(**logging_config)
 
+# map each instruction group to the class emulating it
+instruction_map = {
+    'Arithmetic_i32': ArithmeticInstructions,
+    'Arithmetic_i64': ArithmeticInstructions,
+    'Arithmetic_f32': ArithmeticInstructions,
+    'Arithmetic_f64': ArithmeticInstructions,
+    'Bitwise_i32': BitwiseInstructions,
+    'Bitwise_i64': BitwiseInstructions,
+    'Constant': ConstantInstructions,
+    'Control': ControlInstructions,
+    'Conversion': ConversionInstructions,
+    'Logical_i32': LogicalInstructions,
+    'Logical_i64': LogicalInstructions,
+    'Logical_f32': LogicalInstructions,
+    'Logical_f64': LogicalInstructions,
+    'Memory': MemoryInstructions,
+    'Parametric': ParametricInstructions,
+    'Variable': VariableInstructions,
+}
+# instructions of these groups update the given state in place and never fork
+NON_FORKING_GROUPS = {
+    'Arithmetic_i32', 'Arithmetic_i64', 'Arithmetic_f32', 'Arithmetic_f64',
+    'Bitwise_i32', 'Bitwise_i64', 'Constant', 'Conversion', 'Logical_i32',
+    'Logical_i64', 'Logical_f32', 'Logical_f64', 'Memory', 'Variable'}
+
 
 # =======================================
 # #         WASM Emulator               #
@@ -59,6 +85,22 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
         # set the func index to func name mapping
         Configuration.set_func_index_to_func_name(
             self.ana.names, self.ana.func_prototypes)
+        # precompute the readable name of each function, as they are
+        # frequently queried during the emulation
+        func_index_to_func_name = Configuration.get_func_index_to_func_name()
+        internal_func_names = {
+            f"$func{i}" for i in range(len(self.ana.func_prototypes))}
+        internal_func_names.update(
+            item[0] for item in self.ana.func_prototypes)
+        internal_func_names.update(func_index_to_func_name.values())
+        Configuration.set_readable_func_name(
+            {name: readable_internal_func_name(func_index_to_func_name, name)
+             for name in internal_func_names})
+        # the reverse mapping of func index to func name, the first index
+        # is kept if there are duplicated names
+        self.func_name_to_func_index = {}
+        for index, func_name in func_index_to_func_name.items():
+            self.func_name_to_func_index.setdefault(func_name, index)
 
         if Configuration.get_entry() not in Configuration.get_func_index_to_func_name().values():
             exit(
@@ -75,10 +117,10 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
         self.split_bbs()
 
         # all the exports function's name
-        self.exported_func_names = [i["field_str"]
-                                    for i in self.ana.exports if i["kind"] == 0]
+        self.exported_func_names = {i["field_str"]
+                                    for i in self.ana.exports if i["kind"] == 0}
 
-        self.data_section = dict()
+        self.data_section = DataSection()
         # init memory section with data section
         for _, data_section_value in enumerate(self.ana.datas):
             data = data_section_value['data']
@@ -89,6 +131,9 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
             # self.data_section[(offset, offset + size)] = BitVecVal(int.from_bytes(data, byteorder='big'), size * 8)
             self.data_section[(offset, offset + size)] = data
 
+        # the initial globals, keyed by if the entry function is exported
+        self.globals_template = {}
+
     def remove_unrelated_funcs(self):
         """
         Remove such functions that cannot be regarded as callees from entry
@@ -99,8 +144,7 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
             elem_funcs = set()
             for elem_callee_op in elem_callees:
                 elem_funcs.add(
-                    readable_internal_func_name(
-                        Configuration.get_func_index_to_func_name(),
+                    Configuration.get_readable_func_name(
                         f"$func{elem_callee_op}"))
         except IndexError:
             # there is no elem section in the to-be-analyzed program
@@ -136,8 +180,7 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
         count = 0
         all_func = len(self.cfg.functions)
         while i < len(self.cfg.functions):
-            func_name = readable_internal_func_name(
-                Configuration.get_func_index_to_func_name(),
+            func_name = Configuration.get_readable_func_name(
                 self.cfg.functions[i].name)
             if func_name not in entry_callees:
                 # remove this
@@ -161,15 +204,16 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
 
         for func in self.cfg.functions:
             func_basic_blocks = func.basicblocks
+            # all blocks in a function share the same func_index in their names
+            if func_basic_blocks:
+                _, func_index, _ = func_basic_blocks[0].name.split('_')
 
-            i = 0
-            while i < len(func_basic_blocks):
-                bb = func_basic_blocks[i]
-
-                _, func_index, _ = bb.name.split('_')
+            # the split new blocks are appended to `func_basic_blocks`, and
+            # they will be visited by this loop as well
+            for bb in func_basic_blocks:
                 for ins_i, instruction in enumerate(bb.instructions):
                     # we should split the basic block after these two instructions, if they are not the last instruction
-                    if (instruction.name == 'call' or instruction.name == 'call_indirect') and ins_i != len(bb.instructions) - 1:
+                    if instruction.name in ('call', 'call_indirect') and ins_i != len(bb.instructions) - 1:
                         # if the callee is imported, don't need to split the bb
                         if instruction.name == 'call':
                             callee_index = int(
@@ -191,20 +235,17 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
                         new_bb.instructions = second_part_ins
                         new_bb.start_offset = next_ins.offset
                         new_bb.start_instr = next_ins
-                        new_bb.name = f"block_{func_index}_{hex(new_bb.start_offset)[2:]}"
+                        new_bb.name = f"block_{func_index}_{new_bb.start_offset:x}"
                         new_bb.end_instr = second_part_ins[-1]
                         new_bb.end_offset = new_bb.end_instr.offset_end
 
                         # record the relationship between bb and new_bb
                         # if there are edges start from bb, make them start from new_bb
-                        if bb.name not in tmp_edge_map:
-                            pass
-                        else:
-                            # update the tmp_edge_map
-                            while tmp_edge_map[bb.name]:
-                                e = tmp_edge_map[bb.name].pop()
-                                e.node_from = new_bb.name
-                                tmp_edge_map[new_bb.name].append(e)
+                        moved_edges = tmp_edge_map.pop(bb.name, [])
+                        for e in moved_edges:
+                            e.node_from = new_bb.name
+                        # update the tmp_edge_map
+                        tmp_edge_map[new_bb.name] = moved_edges
 
                         # append the new basic block, add a new edge
                         func_basic_blocks.append(new_bb)
@@ -215,16 +256,12 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
 
                         break
 
-                i += 1
-
             # assert there are no dup blocks, and sort them by both func index and bb index
             block_len = len(func_basic_blocks)
             assert len({bb.name for bb in func_basic_blocks}
                        ) == block_len, "dup block exist"
-            func_basic_blocks = list(
-                sorted(
-                    func_basic_blocks,
-                    key=lambda x: int(x.name.split('_')[2], 16)))
+            # the block's name is block_[func_index]_[start_offset]
+            func_basic_blocks.sort(key=attrgetter('start_offset'))
 
             # write back
             func.basicblocks = func_basic_blocks
@@ -235,34 +272,30 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
         Statically count instructions followed by the entry function
         """
         # only consider the first given func
-        func = readable_internal_func_name(
-            Configuration.get_func_index_to_func_name(),
-            Configuration.get_entry())
-        queue = Queue()
+        func = Configuration.get_readable_func_name(Configuration.get_entry())
+        queue = deque()
         visited = set()
 
         # put the entry func
-        queue.put(func)
+        queue.append(func)
         # put all elem funcs
-        for elem in self.ana.elements[0]["elems"]:
-            queue.put(
-                readable_internal_func_name(
-                    Configuration.get_func_index_to_func_name(),
-                    "$func" + str(elem)))
-
-        while not queue.empty():
-            caller = queue.get()
+        queue.extend(
+            Configuration.get_readable_func_name(f"$func{elem}")
+            for elem in self.ana.elements[0]["elems"])
+
+        while queue:
+            caller = queue.popleft()
             visited.add(caller)
 
             callees = self.cfg.call_graph.get(caller, {})
             for callee in callees:
                 if callee not in visited:
-                    queue.put(callee)
+                    queue.append(callee)
 
         # add the instruction number
+        readable_func_name = Configuration.get_readable_func_name
         for f in self.cfg.functions:
-            concerned_func = readable_internal_func_name(
-                Configuration.get_func_index_to_func_name(), f.name)
+            concerned_func = readable_func_name(f.name)
             if concerned_func in visited:
                 self.total_instructions += len(f.instructions)
                 self.concerned_funcs[concerned_func] = len(f.instructions)
@@ -275,13 +308,11 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
         """
         # extract param and return str
         func_index = None
-        if func_name[0] == '$':
-            func_index = int(re.match('\$func(.*)', func_name).group(1))
+        if func_name.startswith('$func'):
+            # the internal name is like $func12
+            func_index = int(func_name[5:])
         else:
-            for index, wat_func_name in Configuration.get_func_index_to_func_name().items():
-                if wat_func_name == func_name:
-                    func_index = index
-                    break
+            func_index = self.func_name_to_func_index.get(func_name)
 
         assert func_index is not None, f"[!] Cannot find your entry function: {func_name}"
         func_info = self.ana.func_prototypes[func_index]
@@ -290,17 +321,23 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
         return func_index_name, param_str, return_str, func_type
 
     def init_globals(self, state, is_exported):
-        for i, item in enumerate(self.ana.globals):
-            op_type = item[0]
-            if op_type == 'i32':
-                op_val = BitVecVal(item[1], 32) if is_exported else BitVec(
-                    'global_' + str(i) + '_i32', 32)
-            elif op_type == 'i64':
-                op_val = BitVecVal(item[1], 64) if is_exported else BitVec(
-                    'global_' + str(i) + '_i64', 64)
-            else:
-                raise UnsupportGlobalTypeError
-            state.globals[i] = op_val
+        # the initial globals only depend on `is_exported`, thus they are
+        # constructed once and copied into each state
+        if is_exported not in self.globals_template:
+            globals_template = {}
+            for i, item in enumerate(self.ana.globals):
+                op_type = item[0]
+                if op_type == 'i32':
+                    op_val = BitVecVal(item[1], 32) if is_exported else BitVec(
+                        'global_' + str(i) + '_i32', 32)
+                elif op_type == 'i64':
+                    op_val = BitVecVal(item[1], 64) if is_exported else BitVec(
+                        'global_' + str(i) + '_i64', 64)
+                else:
+                    raise UnsupportGlobalTypeError
+                globals_template[i] = op_val
+            self.globals_template[is_exported] = globals_template
+        state.globals.update(self.globals_template[is_exported])
 
     def init_state(self, func_name, param_str):
         state = WasmVMstate()
@@ -349,8 +386,17 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
                 stderr_msg = "got 'unreachable' instruction, now terminate\n"
                 states[0].file_sys[2]['content'] += [ord(i) for i in stderr_msg]
                 raise ProcFailTermination(ASSERT_FAIL)
+            if instruction.group in NON_FORKING_GROUPS:
+                # each state is updated in place, no need to collect them
+                for state in states:
+                    state.instr = instruction
+                    self.emulate_one_instruction(instruction, state, lvar)
+                continue
             next_states = []
-            for state in states:  # TODO: embarassing parallel
+            # NOTE: states are not emulated in a process pool, as the z3
+            # solver and expressions in each state cannot be pickled, and
+            # rebuilding them in workers costs more than the emulation
+            for state in states:
                 state.instr = instruction
                 next_states.extend(self.emulate_one_instruction(
                     instruction, state, lvar))
@@ -358,37 +404,37 @@ class WasmSSAEmulatorEngine(EmulatorEngine):
         return states
 
     def emulate_one_instruction(self, instr, state, lvar=None):
-        instruction_map = {
-            'Arithmetic_i32': ArithmeticInstructions,
-            'Arithmetic_i64': ArithmeticInstructions,
-            'Arithmetic_f32': ArithmeticInstructions,
-            'Arithmetic_f64': ArithmeticInstructions,
-            'Bitwise_i32': BitwiseInstructions,
-            'Bitwise_i64': BitwiseInstructions,
-            'Constant': ConstantInstructions,
-            'Control': ControlInstructions,
-            'Conversion': ConversionInstructions,
-            'Logical_i32': LogicalInstructions,
-            'Logical_i64': LogicalInstructions,
-            'Logical_f32': LogicalInstructions,
-            'Logical_f64': LogicalInstructions,
-            'Memory': MemoryInstructions,
-            'Parametric': ParametricInstructions,
-            'Variable': VariableInstructions,
-        }
         if instr.operand_interpretation is None:
             instr.operand_interpretation = instr.name
 
+        # the arguments are formatted only if the debug level is enabled
         # logging.debug(
-        #     f"\nState:\t{id(state)}\nInstruction:\t{instr.operand_interpretation}\nOffset:\t\t{instr.nature_offset}\n{state.__str__()}")
-
-        instr_obj = instruction_map[instr.group](
+        #     "\nState:\t%s\nInstruction:\t%s\nOffset:\t\t%s\n%s", id(state),
+        #     instr.operand_interpretation, instr.nature_offset, state)
+
+        # the emulating routine only depends on the instruction itself,
+        # thus it is built once and reused in later executions
+        emulate_fn = instr.emulate_fn
+        if emulate_fn is None:
+            emulate_fn = self.build_emulate_fn(instr)
+            instr.emulate_fn = emulate_fn
+        return emulate_fn(state, lvar)
+
+    def build_emulate_fn(self, instr):
+        """
+        Bind the emulating object of the given instruction with the
+        arguments required by its group.
+        The returned function takes `state` and `lvar`.
+        """
+        group = instr.group
+        instr_obj = instruction_map[group](
             instr.name, instr.operand, instr.operand_interpretation)
-        if instr.group == 'Memory':
-            ret_states = instr_obj.emulate(state, self.data_section)
-        elif instr.group == 'Control':
-            ret_states = instr_obj.emulate(
-                state, self.data_section, self.ana, lvar)
+        emulate = instr_obj.emulate
+        data_section = self.data_section
+        if group == 'Memory':
+            return lambda state, lvar: emulate(state, data_section)
+        elif group == 'Control':
+            ana = self.ana
+            return lambda state, lvar: emulate(state, data_section, ana, lvar)
         else:
-            ret_states = instr_obj.emulate(state)
-        return ret_states
+            return lambda state, lvar: emulate(state)
@@ -1,7 +1,6 @@
 import copy
 from collections import defaultdict, deque
 from queue import PriorityQueue
-from queue import Queue
 import random
 
 from z3 import unsat
@@ -11,8 +10,7 @@ from seewasm.arch.wasm.exceptions import (ProcFailTermination,
                                           ProcSuccessTermination)
 from seewasm.arch.wasm.instruction import WasmInstruction
 from seewasm.arch.wasm.lib.utils import is_modeled
-from seewasm.arch.wasm.utils import (query_cache, readable_internal_func_name,
-                                     write_result)
+from seewasm.arch.wasm.utils import query_cache, write_result
 from seewasm.core.basicblock import BasicBlock
 from seewasm.core.edge import EDGE_FALLTHROUGH
 
@@ -178,8 +176,8 @@ class Graph:
                             func_offset = int(instr_operand, 16)
                         target_func = cls.wasmVM.ana.func_prototypes[func_offset]
                         func_name, _, _, _ = target_func
-                        readable_name = readable_internal_func_name(
-                            Configuration.get_func_index_to_func_name(), func_name)
+                        readable_name = Configuration.get_readable_func_name(
+                            func_name)
                         # aes function's name is generated in "name$index" format.
                         # some intrinsic functions starts with $, we should distinguish this situation
                         if readable_name[0] == '$':
@@ -325,8 +323,8 @@ class Graph:
                         callee_op = int(callee_op)
                     except ValueError:
                         callee_op = int(callee_op, 16)
-                    callee_func_name = readable_internal_func_name(
-                        Configuration.get_func_index_to_func_name(), f"$func{callee_op}")
+                    callee_func_name = Configuration.get_readable_func_name(
+                        f"$func{callee_op}")
                     if is_modeled(callee_func_name):
                         continue
 
@@ -346,8 +344,8 @@ class Graph:
                             cls.wasmVM.ana.imports_func)]
                         if possible_callee_type != target_callee_type:
                             continue
-                        possible_callee_func_name = readable_internal_func_name(
-                            Configuration.get_func_index_to_func_name(), f"$func{possible_callee_op}")
+                        possible_callee_func_name = Configuration.get_readable_func_name(
+                            f"$func{possible_callee_op}")
                         if is_modeled(possible_callee_func_name):
                             keep_original_edge_bbs.add(bb_name)
                             continue
@@ -686,8 +684,7 @@ class Graph:
             for item in emul_states:
                 # only the block that locates at the end of the entry function
                 # can be regarded as end of path
-                if readable_internal_func_name(
-                        Configuration.get_func_index_to_func_name(),
+                if Configuration.get_readable_func_name(
                         item.current_func_name) == Configuration.get_entry():
                     write_result(item)
 
@@ -733,11 +730,8 @@ class Graph:
             for func, blks in cls.func_to_bbs.items():
                 if next_block in blks:
                     break
-            not_same_func = readable_internal_func_name(
-                Configuration.get_func_index_to_func_name(),
-                cur_func) != readable_internal_func_name(
-                Configuration.get_func_index_to_func_name(),
-                func)
+            not_same_func = Configuration.get_readable_func_name(
+                cur_func) != Configuration.get_readable_func_name(func)
 
             return not_same_func or cls.sat_cut(state.solver)
         else:
@@ -952,8 +946,7 @@ class Graph:
             for item in emul_states:
                 # only the block that locates at the end of the entry function
                 # can be regarded as end of path
-                if readable_internal_func_name(
-                        Configuration.get_func_index_to_func_name(),
+                if Configuration.get_readable_func_name(
                         item.current_func_name) == Configuration.get_entry():
                     write_result(item)
 
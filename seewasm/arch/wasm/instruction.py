@@ -9,6 +9,9 @@ class WasmInstruction(Instruction):
     TODO
 
     """
+    __slots__ = (
+        'nature_offset', 'insn_byte', 'imm_struct', 'cur_bb', '_group',
+        'emulate_fn')
 
     def __init__(
             self, opcode, name, imm_struct, operand_size, insn_byte, pops,
@@ -36,6 +39,10 @@ class WasmInstruction(Instruction):
         self.ssa = None
         # which basic block locates in
         self.cur_bb = ''
+        # the classification is resolved on the first access of `group`
+        self._group = None
+        # the function emulating this instruction, set by the emulator
+        self.emulate_fn = None
 
     def __eq__(self, other):
         """ Instructions are equal if all features match  """
@@ -61,13 +68,15 @@ class WasmInstruction(Instruction):
     @property
     def group(self):
         """ Instruction classification per group """
-        last_class = _groups.get(0)
-        for k, v in _groups.items():
-            if self.opcode >= k:
-                last_class = v
-            else:
-                return last_class
-        return last_class
+        if self._group is None:
+            last_class = _groups.get(0)
+            for k, v in _groups.items():
+                if self.opcode >= k:
+                    last_class = v
+                else:
+                    break
+            self._group = last_class
+        return self._group
 
     @property
     def is_control(self):
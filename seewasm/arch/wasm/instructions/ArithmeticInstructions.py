@@ -5,7 +5,8 @@ import logging
 from seewasm.arch.wasm.exceptions import UnsupportInstructionError
 from z3 import (RNE, RTN, RTP, RTZ, BitVec, BitVecVal, Float32, Float64, SRem,
                 UDiv, URem, fpAbs, fpAdd, fpDiv, fpMax, fpMin, fpMul, fpNeg,
-                fpRoundToIntegral, fpSqrt, fpSub, is_bool, simplify)
+                fpRoundToIntegral, fpSqrt, fpSub, is_bool, is_bv_value,
+                simplify)
 
 helper_map = {
     'i32': 32,
@@ -19,6 +20,16 @@ float_helper_map = {
     'f64': Float64
 }
 
+# the arithmetic on concrete operands computed with python ints
+# division and remainder are only covered when the divisor is not zero
+concrete_int_op_map = {
+    'add': lambda a, b: a + b,
+    'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b,
+    'div_u': lambda a, b: a // b if b else None,
+    'rem_u': lambda a, b: a % b if b else None,
+}
+
 
 class ArithmeticInstructions:
     def __init__(self, instr_name, instr_operand, _):
@@ -61,6 +72,17 @@ class ArithmeticInstructions:
                 assert arg2.size(
                 ) == helper_map[instr_type], f"in arithmetic instruction, arg2 size is {arg2.size()} instead of {helper_map[instr_type]}"
 
+                # fast path: both operands are concrete, calculate it directly
+                # instead of constructing and simplifying a z3 expression
+                concrete_op = concrete_int_op_map.get(self.instr_name[4:])
+                if concrete_op and is_bv_value(arg1) and is_bv_value(arg2):
+                    result = concrete_op(arg2.as_long(), arg1.as_long())
+                    if result is not None:
+                        bit_width = helper_map[instr_type]
+                        state.symbolic_stack.append(BitVecVal(
+                            result & ((1 << bit_width) - 1), bit_width))
+                        return [state]
+
                 if '.sub' in self.instr_name:
                     result = arg2 - arg1
                 elif '.add' in self.instr_name:
@@ -13,8 +13,8 @@ from seewasm.arch.wasm.lib.c_lib import CPredefinedFunction
 from seewasm.arch.wasm.lib.go_lib import GoPredefinedFunction
 from seewasm.arch.wasm.lib.utils import is_modeled
 from seewasm.arch.wasm.lib.wasi import WASIImportFunction
-from seewasm.arch.wasm.utils import (log_in_out, one_time_query_cache,
-                                     readable_internal_func_name)
+from seewasm.arch.wasm.utils import (log_in_out, one_of_constraint,
+                                     one_time_query_cache)
 
 TERMINATED_FUNCS = {'__assert_fail', 'runtime.divideByZeroPanic'}
 
@@ -36,7 +36,9 @@ class ControlInstructions:
         3. assign popped elements in step 1 in local, change the current_func_name
         """
         logging.info(
-            f"Call: {readable_internal_func_name(Configuration.get_func_index_to_func_name(), state.current_func_name)} -> {callee_func_name}")
+            "Call: %s -> %s",
+            Configuration.get_readable_func_name(state.current_func_name),
+            callee_func_name)
 
         # step 1
         num_arg = 0
@@ -79,7 +81,8 @@ class ControlInstructions:
         caller_func_name, cur_bb, stack, local, require_return = state.context_stack.pop()
 
         logging.info(
-            f"Return: {readable_internal_func_name(Configuration.get_func_index_to_func_name(), state.current_func_name)}")
+            "Return: %s",
+            Configuration.get_readable_func_name(state.current_func_name))
 
         # step 1
         if require_return:
@@ -100,8 +103,7 @@ class ControlInstructions:
         target_func = analyzer.func_prototypes[f_offset]
         callee_func_name, param_str, return_str, _ = target_func
 
-        readable_callee_func_name = readable_internal_func_name(
-            Configuration.get_func_index_to_func_name(),
+        readable_callee_func_name = Configuration.get_readable_func_name(
             callee_func_name)
         if Configuration.get_dsl_flag() and readable_callee_func_name.startswith("checker"):
             # if it is a instrumented function
@@ -146,7 +148,7 @@ class ControlInstructions:
                 func.emul)(
                 state, param_str, return_str, data_section)
         elif readable_callee_func_name in TERMINATED_FUNCS:
-            logging.info(f"Termination: {readable_callee_func_name}")
+            logging.info("Termination: %s", readable_callee_func_name)
             raise ProcFailTermination(ASSERT_FAIL)
         else:
             self.store_context(param_str, return_str, state,
@@ -234,8 +236,7 @@ class ControlInstructions:
             callee_func_name = elem_index_to_func[op - offset]
             callee_func_offset = -1
             for func_offset, item in enumerate(analyzer.func_prototypes):
-                if callee_func_name == readable_internal_func_name(
-                        Configuration.get_func_index_to_func_name(),
+                if callee_func_name == Configuration.get_readable_func_name(
                         item[0]):
                     state.call_indirect_callee = callee_func_name
                     callee_func_offset = func_offset
@@ -263,8 +264,7 @@ class ControlInstructions:
             # construct possible state
             states = []
             for target, index_list in target_branch2index.items():
-                index_list = [simplify(op == i) for i in index_list]
-                cond = simplify(Or(index_list))
+                cond = simplify(one_of_constraint(op, index_list))
                 if is_false(cond):
                     continue
                 elif is_true(cond):
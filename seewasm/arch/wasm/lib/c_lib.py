@@ -12,8 +12,7 @@ from seewasm.arch.wasm.lib.utils import _extract_params, _loadN, _storeN
 from seewasm.arch.wasm.utils import (C_TYPE_TO_LENGTH, FILE_BASE_ADDR,
                                      bin_to_float, calc_memory_align,
                                      getConcreteBitVec, int_to_bytes,
-                                     parse_printf_formatting,
-                                     readable_internal_func_name)
+                                     parse_printf_formatting)
 from z3 import (BitVec, BitVecRef, BitVecVal, Extract, Float64, FPNumRef,
                 FPVal, If, fpBVToFP, fpToReal, is_bv, simplify)
 
@@ -151,8 +150,7 @@ class CPredefinedFunction:
                 possible_callee = analyzer.elements[0]['elems']
                 offset = analyzer.elements[0]['offset']
                 fp_func = '$func' + str(possible_callee[stream - offset])
-                fp_func = readable_internal_func_name(
-                    Configuration.get_func_index_to_func_name(), fp_func)
+                fp_func = Configuration.get_readable_func_name(fp_func)
                 if fp_func == '__stdio_write':
                     logging.info(f"\tthe vfprintf points to {fp_func}")
                     fp = 1
@@ -439,8 +437,7 @@ def find_elem_index(func_name, ana):
     """
     offset = ana.elements[0]['offset']
     for i, elem in enumerate(ana.elements[0]["elems"]):
-        if func_name == readable_internal_func_name(
-                Configuration.get_func_index_to_func_name(),
+        if func_name == Configuration.get_readable_func_name(
                 "$func" + str(elem)):
             return i + offset
     exit(
@@ -457,13 +454,20 @@ def C_extract_string_by_mem_pointer(
         loaded_data = _loadN(state, data_section, mem_pointer, default_len)
         i = default_len
     else:
+        # keep the probed bytes, so the string can be assembled directly
+        # if all of them are concrete, instead of loading it once again
+        probed = [_loadN(state, data_section, mem_pointer, 1)]
         i = 1
         while True:
             loaded_data = _loadN(state, data_section, mem_pointer + i, 1)
             if isinstance(loaded_data, int) and loaded_data == 0:
                 break
+            probed.append(loaded_data)
             i += 1
-        loaded_data = _loadN(state, data_section, mem_pointer, i)
+        if all(isinstance(b, int) for b in probed):
+            loaded_data = int.from_bytes(bytes(probed), 'little')
+        else:
+            loaded_data = _loadN(state, data_section, mem_pointer, i)
 
     # if loaded_data is int, transfer it to the string
     if isinstance(loaded_data, int):
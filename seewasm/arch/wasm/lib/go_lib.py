@@ -258,10 +258,10 @@ class GoPredefinedFunction:
             import datetime
             logging.info(f"Current Time: {datetime.datetime.now()}")
             logging.warning(
-                f"{bcolors.WARNING}Div-zero! In {get_source_location_string(analyzer, func_ind, func_offset)}{bcolors.ENDC}")
+                bcolors.warning(f"Div-zero! In {get_source_location_string(analyzer, func_ind, func_offset)}"))
             if divisor is not None:
                 logging.warning(
-                    f"{bcolors.WARNING}The op2 ({divisor}) may be zero, which may result in Div-Zero vulnerability!{bcolors.ENDC}")
+                    bcolors.warning(f"The op2 ({divisor}) may be zero, which may result in Div-Zero vulnerability!"))
             manually_constructed = True
         elif self.name == 'runtime.lookupPanic':
             func_ind = get_func_index_from_state(analyzer, state)
@@ -269,7 +269,7 @@ class GoPredefinedFunction:
             import datetime
             logging.info(f"Current Time: {datetime.datetime.now()}")
             logging.warning(
-                f"{bcolors.WARNING}{self.name} is possible! In {get_source_location_string(analyzer, func_ind, func_offset)}{bcolors.ENDC}")
+                bcolors.warning(f"{self.name} is possible! In {get_source_location_string(analyzer, func_ind, func_offset)}"))
             manually_constructed = True
         elif self.name in PANIC_FUNCTIONS:
             func_ind = get_func_index_from_state(analyzer, state)
@@ -277,7 +277,7 @@ class GoPredefinedFunction:
             import datetime
             logging.info(f"Current Time: {datetime.datetime.now()}")
             logging.warning(
-                f"{bcolors.WARNING}{PANIC_FUNCTIONS[self.name]}! In {get_source_location_string(analyzer, func_ind, func_offset)}{bcolors.ENDC}")
+                bcolors.warning(f"{PANIC_FUNCTIONS[self.name]}! In {get_source_location_string(analyzer, func_ind, func_offset)}"))
             manually_constructed = True
         elif self.name == 'runtime.calculateHeapAddresses':
             calculateHeapAddresses(state, data_section)
@@ -51,6 +51,9 @@ def _extract_params(param_str, state):
 
 
 def _storeN(state, dest, val, len_in_bytes):
+    # raw bytes are stored in little endian, like the strings in memory
+    if isinstance(val, (bytes, bytearray)):
+        val = int.from_bytes(val, 'little')
     if not is_bv(val):
         state.symbolic_memory = insert_symbolic_memory(
             state.symbolic_memory, dest, len_in_bytes,
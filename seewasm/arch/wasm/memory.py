@@ -1,10 +1,12 @@
 # This file is the memory emulation
 # Can refer the corresponding description in EOSAFE
-# only export lookup_symbolic_memory_data_section and insert_symbolic_memory
+# only export DataSection, lookup_symbolic_memory_data_section and insert_symbolic_memory
 
 import logging
-from copy import deepcopy
+from bisect import bisect_left
+from functools import lru_cache
 
+from seewasm.arch.wasm.configuration import Configuration
 from seewasm.arch.wasm.utils import (_extract_outermost_int,
                                      one_time_query_cache_without_solver)
 from z3 import (And, BitVec, BitVecVal, Concat, Extract, If, is_bv,
@@ -27,6 +29,74 @@ from z3 import (And, BitVec, BitVecVal, Concat, Extract, If, is_bv,
 # case 13:          |             |        [______]         False
 
 
+class DataSection(dict):
+    """
+    The data section, which maps (start, end) to the initialized bytes.
+
+    The intervals are also indexed by their start address, so that the
+    overlapped intervals can be found by binary search instead of
+    iterating all the segments on every memory access.
+    The bytes are kept as memoryviews over immutable bytes, thus slicing
+    them for a load does not copy the underlying segment.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._index = None
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __setitem__(self, key, value):
+        # a view of bytes is read-only and hashable, as the lru_cache of
+        # _bytes_to_bitvecval requires
+        super().__setitem__(key, memoryview(bytes(value)))
+        self._index = None
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._index = None
+
+    def _build_index(self):
+        intervals = sorted(self.keys())
+        starts = [start for start, _ in intervals]
+        # the max end among the first i+1 intervals, so that the backward
+        # search can stop early even if some intervals are overlapped
+        max_ends = []
+        max_end = None
+        for _, end in intervals:
+            max_end = end if max_end is None else max(max_end, end)
+            max_ends.append(max_end)
+        self._index = (intervals, starts, max_ends)
+
+    def find_overlap(self, dest, length):
+        """
+        Find the intervals overlapped with (dest, dest+length), return them
+        as [[existed_start, existed_end], ...]
+        """
+        if self._index is None:
+            self._build_index()
+        intervals, starts, max_ends = self._index
+
+        overlapped_intervals = []
+        # intervals whose start is less than dest + length
+        i = bisect_left(starts, dest + length)
+        while i > 0 and max_ends[i - 1] > dest:
+            i -= 1
+            existed_start, existed_end = intervals[i]
+            if existed_end > dest:
+                overlapped_intervals.append([existed_start, existed_end])
+        overlapped_intervals.reverse()
+        return overlapped_intervals
+
+    def upper_bound(self):
+        """
+        The highest end address among all intervals
+        """
+        if self._index is None:
+            self._build_index()
+        return self._index[2][-1]
+
+
 def lookup_symbolic_memory_data_section(
         symbolic_memory, data_section, dest, length):
     """
@@ -40,7 +110,7 @@ def lookup_symbolic_memory_data_section(
         # we heuristically think the symbolic pointer will not point to the data_section
         return _lookup_symbolic_memory_with_symbol(
             symbolic_memory, dest, length,
-            l_bound=max(data_section, key=lambda x: x[1])[1])
+            l_bound=_data_section_upper_bound(data_section))
 
     # in data section?
     in_symbolic_memory, is_overlapped = _is_in_symbolic_memory(
@@ -122,8 +192,10 @@ def _lookup_symbolic_memory_with_symbol(
                   _big_construct_ite(symbolic_memory, dest, length))
 
     # recursively construct ite statements
-    dup_symbolic_memory = deepcopy(symbolic_memory)
-    logging.info(f"Encounter a symbolic pointer: {dest}")
+    # _big_construct_ite only pops items out of the dict, and the z3 values
+    # are immutable, so a shallow copy is enough
+    dup_symbolic_memory = symbolic_memory.copy()
+    logging.info("Encounter a symbolic pointer: %s", dest)
     tmp_result = _big_construct_ite(dup_symbolic_memory, dest, length)
     return tmp_result
 
@@ -186,12 +258,16 @@ def _lookup_data_section(data_section, dest, length):
     # -------------------------
     # Updated version, just retrieve the necessary part:
     data_section_bytes = data_section[(existed_start, existed_end)][low:high]
-    data_section_bitvec = BitVecVal(
-        int.from_bytes(data_section_bytes, 'little'),
-        len(data_section_bytes) * 8)
-    data = simplify(Extract((high - low) * 8 - 1, 0, data_section_bitvec))
+    return _bytes_to_bitvecval(data_section_bytes)
 
-    return data
+
+@lru_cache(maxsize=4096)
+def _bytes_to_bitvecval(data_bytes):
+    """
+    Convert the little-endian bytes loaded from data section to BitVecVal.
+    The data section is read-only, so the same bytes are loaded repeatedly.
+    """
+    return BitVecVal(int.from_bytes(data_bytes, 'little'), len(data_bytes) * 8)
 
 
 def _lookup_symbolic_memory(symbolic_memory, dest, length):
@@ -213,6 +289,19 @@ def _lookup_symbolic_memory(symbolic_memory, dest, length):
     return data
 
 
+def _simplify_written(data):
+    """
+    Simplify the data to be kept in symbolic memory.
+
+    With `--lazy_simplify`, only the data whose operands are all concrete is
+    folded, so that concrete memory is still loaded as BitVecVal
+    """
+    if Configuration.get_simplify_memory_writes() or all(
+            is_bv_value(arg) for arg in data.children()):
+        return simplify(data)
+    return data
+
+
 def insert_symbolic_memory(symbolic_memory, dest, length, data):
     # if dest type is a bit vector, insert directly
     if is_bv(dest) and not is_bv_value(dest):
@@ -245,7 +334,7 @@ def insert_symbolic_memory(symbolic_memory, dest, length, data):
             second_interval = symbolic_memory.pop(
                 (existed_start_2, existed_end_2))
             # NOTE here the order of intervals cannot be exchanged
-            padded_interval = simplify(Concat(
+            padded_interval = _simplify_written(Concat(
                 second_interval,
                 BitVecVal(0, (existed_start_2 - existed_end_1) * 8),
                 first_interval))
@@ -269,23 +358,23 @@ def insert_symbolic_memory(symbolic_memory, dest, length, data):
             # step 1.2: calculate the first part
             high, low = overlapped_start - existed_start, 0
             if high != low:
-                to_concat.insert(0, simplify(
+                to_concat.insert(0, _simplify_written(
                     Extract(high * 8 - 1, low * 8, original)))
 
             # step 1.3: calculate the second part
             high, low = overlapped_end - dest, overlapped_start - dest
             if high != low:
-                to_concat.insert(0, simplify(
+                to_concat.insert(0, _simplify_written(
                     Extract(high * 8 - 1, low * 8, data)))
 
             # step 1.4: calculate the third part
             high, low = existed_end - existed_start, overlapped_end - existed_start
             if high != low:
-                to_concat.insert(0, simplify(
+                to_concat.insert(0, _simplify_written(
                     Extract(high * 8 - 1, low * 8, original)))
 
             # step 1.5: concat
-            to_insert = simplify(Concat(to_concat)) if len(
+            to_insert = _simplify_written(Concat(to_concat)) if len(
                 to_concat) > 1 else to_concat[0]
 
             # step 1.6: insert into the memory
@@ -308,7 +397,7 @@ def insert_symbolic_memory(symbolic_memory, dest, length, data):
 
         for i in free_intervals:
             high, low = i[1] - dest, i[0] - dest
-            symbolic_memory[(i[0], i[1])] = simplify(
+            symbolic_memory[(i[0], i[1])] = _simplify_written(
                 Extract(high * 8 - 1, low * 8, data))
 
     # step 3:
@@ -338,7 +427,7 @@ def _merge_symbolic_memory(symbolic_memory):
             # merge!
             first_part = symbolic_memory_dup.pop(current_key)
             second_part = symbolic_memory_dup.pop(next_key)
-            data = simplify(Concat(second_part, first_part))
+            data = _simplify_written(Concat(second_part, first_part))
             symbolic_memory_dup[(current_key[0], next_key[1])] = data
 
             int_keys.remove(current_key)
@@ -378,7 +467,7 @@ def _is_in_symbolic_memory(symbolic_memory, data_section, dest, length):
         return [True, True]
 
     # if (dest, dest+length) is not in symbolic memory, find it in data section
-    tmp_result = _iterate_find_overlap(data_section, dest, length)
+    tmp_result = _find_overlap_in_data_section(data_section, dest, length)
     if tmp_result:
         return [False, True]
 
@@ -409,6 +498,22 @@ def _iterate_find_overlap(target_dict, dest, length):
     return overlapped_intervals
 
 
+def _find_overlap_in_data_section(data_section, dest, length):
+    """
+    Find the intervals in data section that overlap on (dest, dest+length).
+    Use the index if the data section is a `DataSection`, or iterate it.
+    """
+    if isinstance(data_section, DataSection) and isinstance(dest, int):
+        return data_section.find_overlap(dest, length)
+    return _iterate_find_overlap(data_section, dest, length)
+
+
+def _data_section_upper_bound(data_section):
+    if isinstance(data_section, DataSection):
+        return data_section.upper_bound()
+    return max(data_section, key=lambda x: x[1])[1]
+
+
 def _lookup_overlapped_interval(symbolic_memory, data_section, dest, length):
     '''
     Given the (dest, dest+length), find the overlapped intervals (either in symbolic memory, or
@@ -423,7 +528,7 @@ def _lookup_overlapped_interval(symbolic_memory, data_section, dest, length):
         return tmp_result
 
     # if (dest, dest+length) is not in symbolic memory, find it in data section
-    tmp_result = _iterate_find_overlap(data_section, dest, length)
+    tmp_result = _find_overlap_in_data_section(data_section, dest, length)
     assert len(
         tmp_result) <= 2, f"the data section can only have 0 to 2 overlapped interval, but we found {len(tmp_result)} ({tmp_result})"
     if tmp_result:
@@ -13,25 +13,28 @@ from seewasm.arch.wasm.configuration import Configuration
 from seewasm.arch.wasm.exceptions import (INVALIDMEMORY, ProcFailTermination,
                                           UnsupportZ3TypeError)
 from seewasm.arch.wasm.solver import SMTSolver
-from z3 import (FP, BitVec, BitVecRef, Float32, Float64, is_bv, is_bv_value,
-                sat, unsat)
+from z3 import (FP, ULE, And, BitVec, BitVecRef, Float32, Float64, Or, is_bv,
+                is_bv_value, sat, unsat)
 
 # this is the opened files base addr
 FILE_BASE_ADDR = 100000000
 
 
 # this is a mapping, which maps the data type to the corresponding BitVec
+# the float sorts are created once, instead of on each call
+_FLOAT32_SORT, _FLOAT64_SORT = Float32(), Float64()
+Z3_VAR_CONSTRUCTORS = {
+    'i32': lambda name: BitVec(name, 32),
+    'i64': lambda name: BitVec(name, 64),
+    'f32': lambda name: FP(name, _FLOAT32_SORT),
+    'f64': lambda name: FP(name, _FLOAT64_SORT)}
+
+
 def getConcreteBitVec(type, name):
-    if type == 'i32':
-        return BitVec(name, 32)
-    elif type == 'i64':
-        return BitVec(name, 64)
-    elif type == 'f32':
-        return FP(name, Float32())
-    elif type == 'f64':
-        return FP(name, Float64())
-    else:
+    z3_var_constructor = Z3_VAR_CONSTRUCTORS.get(type)
+    if z3_var_constructor is None:
         raise UnsupportZ3TypeError
+    return z3_var_constructor(name)
 
 
 def readable_internal_func_name(func_index_to_func_name, internal_func_name):
@@ -92,8 +95,8 @@ def calc_memory_align(parsed_pattern):
     return offset
 
 
-def parse_printf_formatting(lines):
-    cfmt = '''\
+# the conversion specifications in C printf, compiled once at import
+C_FORMAT_PATTERN = re.compile(r'''
 (                                  # start of capture group 1
 %                                  # literal "%"
 (?:                                # first option
@@ -104,12 +107,14 @@ def parse_printf_formatting(lines):
 [cCdiouxXeEfgGaAnpsSZ]             # type
 ) |                                # OR
 %%)                                # literal "%%"
-'''
+''', flags=re.X)
+
 
+def parse_printf_formatting(lines):
     # tuple list, in which each element consisting of line number, begin position and pattern
     result = []
     for line_num, line in enumerate(lines.splitlines()):
-        for m in re.finditer(cfmt, line, flags=re.X):
+        for m in C_FORMAT_PATTERN.finditer(line):
             result.append([line_num, m.start(1), m.group(1)])
     return result
 
@@ -134,6 +139,29 @@ def _extract_outermost_int(num):
     return the_int
 
 
+def range_constraint(var, lo, hi):
+    """
+    Construct the constraint that `var` lies in [lo, hi], unsigned
+    """
+    return And(ULE(lo, var), ULE(var, hi))
+
+
+def one_of_constraint(var, candidates):
+    """
+    Construct the constraint that `var` equals one of the ascending
+    `candidates`. Each run of consecutive candidates is folded into a single
+    range, instead of a disjunction of equalities
+    """
+    runs = []
+    for i in candidates:
+        if runs and runs[-1][1] + 1 == i:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return Or([var == lo if lo == hi else range_constraint(var, lo, hi)
+               for lo, hi in runs])
+
+
 def str_to_little_endian_int(string):
     """
     Convert the given string to an integer, little endian
@@ -255,17 +283,22 @@ def log_in_out(func_name, directory):
     return decorator
 
 
+def _constraints_key(constraints):
+    """
+    The key of a set of constraints in the z3 cache, which is irrelevant to
+    the order of constraints
+    """
+    return frozenset(hash(c) for c in constraints)
+
+
 def query_cache(solver):
     """
     Check is assertions in solver are cached.
     If they are, return directly, or update the cache and return
     """
-    cons_hash_set = {hash(c) for c in solver.assertions()}
-    cons_hash_list = list(cons_hash_set)
-    cons_hash_list.sort()
-    cons_hash_tuple = tuple(cons_hash_list)
+    cons_key = _constraints_key(solver.assertions())
 
-    if cons_hash_tuple not in Configuration._z3_cache_dict:
+    if cons_key not in Configuration._z3_cache_dict:
         solver_check_result = solver.check()
 
         # try to terminate invalid-memory in advance
@@ -273,12 +306,13 @@ def query_cache(solver):
             m = solver.model()
             for k in m:
                 if str(k) == 'invalid-memory':
-                    Configuration._z3_cache_dict[cons_hash_tuple] = unsat
+                    Configuration._z3_cache_dict[cons_key] = unsat
+                    Configuration._z3_invalid_memory_keys.add(cons_key)
                     raise ProcFailTermination(INVALIDMEMORY)
 
-        Configuration._z3_cache_dict[cons_hash_tuple] = solver_check_result
+        Configuration._z3_cache_dict[cons_key] = solver_check_result
     else:
-        solver_check_result = Configuration._z3_cache_dict[cons_hash_tuple]
+        solver_check_result = Configuration._z3_cache_dict[cons_key]
 
     return solver_check_result
 
@@ -288,6 +322,13 @@ def one_time_query_cache(solver, con):
     the *args are received constraints, they will not be inserted into the solver.
     It is an one-time query
     """
+    # if the existing constraints are known to be unsatisfiable, adding
+    # `con` cannot make them satisfiable, so no need to query again
+    base_key = _constraints_key(solver.assertions())
+    if Configuration._z3_cache_dict.get(base_key) == unsat and \
+            base_key not in Configuration._z3_invalid_memory_keys:
+        return unsat
+
     solver.push()
     solver.add(con)
     solver_check_result = query_cache(solver)
@@ -297,16 +338,26 @@ def one_time_query_cache(solver, con):
 
 
 def one_time_query_cache_without_solver(con):
-    cons_hash_set = set([hash(c) for c in [con]])
-    cons_hash_list = list(cons_hash_set)
-    cons_hash_list.sort()
-    cons_hash_tuple = tuple(cons_hash_list)
-    if cons_hash_tuple not in Configuration._z3_cache_dict:
-        s = SMTSolver(Configuration.get_solver())
-        s.add(con)
-        solver_check_result = s.check()
-        Configuration._z3_cache_dict[cons_hash_tuple] = solver_check_result
+    cons_key = _constraints_key([con])
+    if cons_key not in Configuration._z3_cache_dict:
+        if Configuration.get_incremental_solving():
+            # reuse one solver, each query is wrapped in push and pop
+            if Configuration._standalone_solver is None:
+                Configuration._standalone_solver = SMTSolver(
+                    Configuration.get_solver())
+            s = Configuration._standalone_solver
+            s.push()
+            try:
+                s.add(con)
+                solver_check_result = s.check()
+            finally:
+                s.pop()
+        else:
+            s = SMTSolver(Configuration.get_solver())
+            s.add(con)
+            solver_check_result = s.check()
+        Configuration._z3_cache_dict[cons_key] = solver_check_result
     else:
-        solver_check_result = Configuration._z3_cache_dict[cons_hash_tuple]
+        solver_check_result = Configuration._z3_cache_dict[cons_key]
 
     return solver_check_result
@@ -1,15 +1,21 @@
 # This file defines the `state` that will be passed within Wasm-SE
+import copy
 from collections import defaultdict
 
 from seewasm.arch.wasm.configuration import Configuration
 from seewasm.arch.wasm.solver import SMTSolver
-from seewasm.arch.wasm.utils import (init_file_for_file_sys,
-                                     readable_internal_func_name)
+from seewasm.arch.wasm.utils import init_file_for_file_sys
 from seewasm.engine.engine import VMstate
 from z3 import BitVecVal
 
 
 class WasmVMstate(VMstate):
+    __slots__ = (
+        'symbolic_stack', 'symbolic_memory', 'local_var', 'globals', 'instr',
+        'current_func_name', 'current_bb_name', 'sign_mapping',
+        'context_stack', 'args', 'file_sys', 'edge_type', 'solver',
+        'call_indirect_callee')
+
     def __init__(self):
         # data structure:
         def local_default():
@@ -55,13 +61,44 @@ class WasmVMstate(VMstate):
         self.call_indirect_callee = ''
 
     def __str__(self):
-        return f'''Current Func:\t{readable_internal_func_name(Configuration.get_func_index_to_func_name(), self.current_func_name)}
+        return f'''Current Func:\t{Configuration.get_readable_func_name(self.current_func_name)}
 Stack:\t\t{self.symbolic_stack}
 Local Var:\t{self.local_var}
 Global Var:\t{self.globals}
 Memory:\t\t{self.symbolic_memory}
 Constraints:\t{self.solver.assertions()}\n'''
 
+    def __deepcopy__(self, memo):
+        """
+        Fork the state when a branch is taken.
+
+        The items kept in the containers (z3 expressions, strings and ints)
+        are immutable, and the `instr` is a static object of the CFG, thus
+        only the containers themselves have to be cloned, instead of
+        recursively copying every z3 expression within them.
+        """
+        new_state = self.__class__.__new__(self.__class__)
+        memo[id(self)] = new_state
+        new_state.__setstate__(self.__getstate__())
+
+        new_state.symbolic_stack = list(self.symbolic_stack)
+        new_state.symbolic_memory = self.symbolic_memory.copy()
+        new_state.local_var = self.local_var.copy()
+        new_state.globals = self.globals.copy()
+        new_state.sign_mapping = self.sign_mapping.copy()
+        # each context is (func_name, bb_name, stack, local, require_return)
+        new_state.context_stack = [
+            (func_name, bb_name, list(stack), local.copy(), require_return)
+            for func_name, bb_name, stack, local, require_return in self.context_stack]
+        new_state.args = list(self.args)
+        new_state.file_sys = {}
+        for fd, file_info in self.file_sys.items():
+            new_file_info = file_info.copy()
+            new_file_info["content"] = list(file_info["content"])
+            new_state.file_sys[fd] = new_file_info
+        new_state.solver = copy.deepcopy(self.solver, memo)
+        return new_state
+
     def details(self):
         raise NotImplementedError
 
@@ -69,4 +106,8 @@ Constraints:\t{self.solver.assertions()}\n'''
         return False
 
     def __getstate__(self):
-        return self.__dict__.copy()
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
@@ -2,6 +2,9 @@ class Instruction(object):
     """
     The instruction object
     """
+    __slots__ = (
+        'opcode', 'offset', 'name', 'description', 'operand_size', 'operand',
+        'operand_interpretation', 'pops', 'pushes', 'fee', 'xref', 'ssa')
 
     def __init__(self, opcode, name,
                  operand_size, pops, pushes, fee,
@@ -10,6 +10,12 @@ import sys
 resource.setrlimit(resource.RLIMIT_AS, (4 * 1024 * 1024 * 1024, -1))
 
 testcase_dir = './test/'
+result_dir_root = './log/result'
+
+def find_result_dirs(prefix):
+    # scandir yields the entries with their types, no fnmatch over every name
+    return [entry.path for entry in os.scandir(result_dir_root)
+            if entry.is_dir() and entry.name.startswith(prefix)]
 
 @pytest.mark.parametrize('wasm_path, entry', [
     ('hello_world.wasm', ''),
@@ -31,7 +37,7 @@ def test_return_simulation():
     cmd = [sys.executable, 'launcher.py', '-f', wasm_path, '-s', '-v', 'info', '--source_type', 'rust']
     subprocess.run(cmd, timeout=900, check=True)
 
-    result_dir = glob.glob('./log/result/test_return_*')
+    result_dir = find_result_dirs('test_return_')
     assert len(result_dir) == 1, 'more than one matching results, do you have multiple `test_return*` cases?'
     result_dir = result_dir[0]
     state_path = glob.glob(f'{result_dir}/state*.json')
@@ -46,7 +52,7 @@ def test_unreachable_simulation():
     cmd = [sys.executable, 'launcher.py', '-f', wasm_path, '-s', '-v', 'info', '--source_type', 'rust']
     subprocess.run(cmd, timeout=900, check=True)
 
-    result_dir = glob.glob('./log/result/test_unreachable_*')
+    result_dir = find_result_dirs('test_unreachable_')
     assert len(result_dir) == 1, 'more than one matching results, do you have multiple `test_unreachable*` cases?'
     result_dir = result_dir[0]
     state_path = glob.glob(f'{result_dir}/state*.json')